@@ -2,7 +2,7 @@ import re
 import textwrap
 from ast import parse as ast_parse
 from copy import copy
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import black
 
@@ -34,6 +34,8 @@ contextual_matcher = re.compile(
     r"(.*)^(if|elif|else|with|for|while)([^:]*)(:.*)", re.S | re.M
 )
 after_if_keywords = ("elif", "else")
+# this regex matches a parameter black has nothing to change in: a name or an integer
+simple_param_matcher = re.compile(r"([A-Za-z_]\w*=)?([A-Za-z_]\w*|[0-9]+)", re.ASCII)
 
 
 def is_all_comments(string):
@@ -63,17 +65,24 @@ class Formatter(Parser):
         line_length: Optional[int] = None,
         black_config_file: Optional[PathLike] = None,
     ):
-        self.result: str = ""
+        # Output is assembled in pieces: joining once avoids copying it per piece
+        self._result: List[str] = list()
         self.lagging_comments: str = ""
         self.no_formatting_yet: bool = True
 
         self.black_mode = read_black_config(black_config_file)
+        # Identical code often recurs across rules: reuse black's output for it
+        self._black_cache: Dict[Tuple[str, int], str] = dict()
 
         if line_length is not None:
             self.black_mode.line_length = line_length
 
         super().__init__(snakefile)  # Call to parse snakefile
 
+    @property
+    def result(self) -> str:
+        return "".join(self._result)
+
     def get_formatted(self) -> str:
         return self.result
 
@@ -84,7 +93,7 @@ class Formatter(Parser):
         in_global_context: bool = False,
     ) -> None:
         if len(self.buffer) == 0 or self.buffer.isspace():
-            self.result += self.buffer
+            self._result.append(self.buffer)
             self.buffer = ""
             return
 
@@ -141,7 +150,7 @@ class Formatter(Parser):
         if self.syntax.enter_context:
             formatted += ":"
         formatted += f"{self.syntax.comment}\n"
-        self.result += formatted
+        self._result.append(formatted)
         self.last_recognised_keyword = self.syntax.keyword_name
 
     def process_keyword_param(
@@ -152,7 +161,7 @@ class Formatter(Parser):
             in_global_context=in_global_context,
             context=param_context,
         )
-        self.result += self.format_params(param_context)
+        self._result.append(self.format_params(param_context))
         self.last_recognised_keyword = param_context.keyword_name
 
     def run_black_format_str(
@@ -187,12 +196,17 @@ class Formatter(Parser):
 
         # reduce black target line length according to how indented the code is
         current_line_length = (target_indent or 0) * TAB_SIZE
-        black_mode = copy(self.black_mode)
-        black_mode.line_length = max(
-            0, black_mode.line_length - current_line_length + extra_spacing
+        line_length = max(
+            0, self.black_mode.line_length - current_line_length + extra_spacing
         )
+        cache_key = (string, line_length)
         try:
-            fmted = black.format_str(string, mode=black_mode)
+            fmted = self._black_cache.get(cache_key)
+            if fmted is None:
+                black_mode = copy(self.black_mode)
+                black_mode.line_length = line_length
+                fmted = black.format_str(string, mode=black_mode)
+                self._black_cache[cache_key] = fmted
         except black.InvalidInput as e:
             err_msg = ""
             # Not clear whether all Black errors start with 'Cannot parse' - it seems to
@@ -301,8 +315,39 @@ class Formatter(Parser):
             # A snakemake parameter is syntactically like a function parameter
             ast_parse(f"param({val})")
         except SyntaxError:
-            raise InvalidParameterSyntax(f"{parameter.line_nb}{val}") from None
+            raise InvalidParameterSyntax(f"L{parameter.value_line_nb}: {val}") from None
+
+        if simple_param_matcher.fullmatch(val.strip()) is not None:
+            # Black leaves a lone name or integer, and its key, unchanged
+            val = val.strip()
+        else:
+            val = self.format_param_value(
+                val, target_indent, inline_formatting, param_list
+            )
+        val = self.align_strings(val, target_indent)
 
+        result = ""
+        if not inline_formatting:
+            for comment in parameter.pre_comments:
+                result += f"{string_indent}{comment}\n"
+        result += val.strip("\n")
+        if param_list:
+            result += ","
+        post_comment_iter = iter(parameter.post_comments)
+        if parameter._has_inline_comment:
+            result += f"{COMMENT_SPACING}{next(post_comment_iter)}"
+        result += "\n"
+        for comment in post_comment_iter:
+            result += f"{string_indent}{comment}\n"
+        return result
+
+    def format_param_value(
+        self,
+        val: str,
+        target_indent: int,
+        inline_formatting: bool,
+        param_list: bool,
+    ) -> str:
         if inline_formatting or param_list:
             val = " ".join(
                 val.rstrip().split("\n")
@@ -343,23 +388,7 @@ class Formatter(Parser):
             match_equal = re.match(r"f\((.*)\)", val, re.DOTALL)
             val = match_equal.group(1)
             val = textwrap.dedent(val)
-
-        val = self.align_strings(val, target_indent)
-
-        result = ""
-        if not inline_formatting:
-            for comment in parameter.pre_comments:
-                result += f"{string_indent}{comment}\n"
-        result += val.strip("\n")
-        if param_list:
-            result += ","
-        post_comment_iter = iter(parameter.post_comments)
-        if parameter._has_inline_comment:
-            result += f"{COMMENT_SPACING}{next(post_comment_iter)}"
-        result += "\n"
-        for comment in post_comment_iter:
-            result += f"{string_indent}{comment}\n"
-        return result
+        return val
 
     def format_params(self, parameters: ParameterSyntax) -> str:
         target_indent = parameters.keyword_indent
@@ -425,23 +454,25 @@ class Formatter(Parser):
             if not self.no_formatting_yet and not collate_same_singleparamkeyword:
                 after_if_statement = self.buffer.startswith(after_if_keywords)
                 if max(cur_indent, 0) in (0, None) and not after_if_statement:
-                    self.result += "\n\n"
+                    self._result.append("\n\n")
                 elif in_global_context or after_if_statement:
-                    self.result += "\n"
+                    self._result.append("\n")
         if in_global_context:  # Deal with comments
             if self.lagging_comments != "":
-                self.result += self.lagging_comments
+                self._result.append(self.lagging_comments)
                 self.lagging_comments = ""
 
             if len(all_lines) > 0:
                 if not have_only_comment_lines:
-                    self.result += "\n".join(all_lines[:comment_break]).rstrip() + "\n"
+                    self._result.append(
+                        "\n".join(all_lines[:comment_break]).rstrip() + "\n"
+                    )
                 if comment_matches > 0:
                     self.lagging_comments = "\n".join(all_lines[comment_break:]) + "\n"
                     if final_flush:
-                        self.result += self.lagging_comments
+                        self._result.append(self.lagging_comments)
         else:
-            self.result += formatted_string
+            self._result.append(formatted_string)
 
         if self.no_formatting_yet:
             if comment_break > 0:
@@ -1,6 +1,6 @@
 import tokenize
 from abc import ABC, abstractmethod
-from typing import NamedTuple, Optional
+from typing import List, NamedTuple, Optional
 
 from snakefmt.exceptions import UnsupportedSyntax
 from snakefmt.parser.grammar import Context, PythonCode, SnakeGlobal
@@ -10,13 +10,15 @@ from snakefmt.parser.syntax import (
     Vocabulary,
     add_token_space,
     fstring_processing,
-    is_newline,
     re_add_curly_bracket_if_needed,
 )
 from snakefmt.types import TAB, Token, TokenIterator, col_nb
 
+# Stands in for the keyword, already consumed, preceding a queriable token search
+consumed_keyword = Token(tokenize.NAME)
 
-def not_a_comment_related_token(token):
+
+def not_a_comment_related_token(token: Token) -> bool:
     return not (
         token.type == tokenize.COMMENT
         or token.type == tokenize.NEWLINE
@@ -31,6 +33,14 @@ class Snakefile:
     Adapted from snakemake.parser.Snakefile
     """
 
+    __slots__ = (
+        "stream",
+        "_live_tokens",
+        "_buffered_tokens",
+        "rulecount",
+        "lines",
+    )
+
     def __init__(self, fpath_or_stream, rulecount=0):
         try:
             self.stream = open(fpath_or_stream, encoding="utf-8")
@@ -43,10 +53,9 @@ class Snakefile:
         self.lines = 0
 
     def __next__(self) -> Token:
-        if len(self._buffered_tokens) == 0:
-            return next(self._live_tokens)
-        else:
+        if self._buffered_tokens:
             return self._buffered_tokens.pop()
+        return next(self._live_tokens)
 
     def denext(self, token: Token) -> None:
         self._buffered_tokens.append(token)
@@ -272,60 +281,77 @@ class Parser(ABC):
         Note: comments are annoying, as when preceded by indents/dedents,
         they are output by the tokenizer before those indents/dedents.
         """
-        buffer = ""
+        buffer: List[str] = list()
         newline = False
         pythonable = False
         block_indent = -1
-        prev_token: Optional[Token] = Token(tokenize.NAME)
+        prev_token: Optional[Token] = consumed_keyword
+        # The context cannot change until a keyword is returned
+        syntax = self.syntax
+        next_token = snakefile.__next__
         while True:
-            token = next(snakefile)
+            token = next_token()
+            token_type, token_string = token.type, token.string
             self.in_fstring = fstring_processing(token, prev_token, self.in_fstring)
             if block_indent == -1 and not_a_comment_related_token(token):
-                block_indent = self.cur_indent
-            if token.type == tokenize.INDENT:
-                self.syntax.cur_indent += 1
+                block_indent = syntax.cur_indent
+            if token_type == tokenize.INDENT:
+                syntax.cur_indent += 1
                 prev_token = None
                 continue
-            elif token.type == tokenize.DEDENT:
-                if self.cur_indent > 0:
-                    self.syntax.cur_indent -= 1
+            elif token_type == tokenize.DEDENT:
+                if syntax.cur_indent > 0:
+                    syntax.cur_indent -= 1
                 prev_token = None
                 continue
-            elif token.type == tokenize.ENDMARKER:
+            elif token_type == tokenize.ENDMARKER:
                 return Status(
-                    token, block_indent, self.cur_indent, buffer, True, pythonable
+                    token,
+                    block_indent,
+                    syntax.cur_indent,
+                    "".join(buffer),
+                    True,
+                    pythonable,
                 )
-            elif token.type == tokenize.COMMENT:
+            elif token_type == tokenize.COMMENT:
                 if col_nb(token) == 0:
-                    return Status(token, block_indent, 0, buffer, False, pythonable)
+                    return Status(
+                        token, block_indent, 0, "".join(buffer), False, pythonable
+                    )
 
-            elif is_newline(token):
+            elif token_type == tokenize.NEWLINE or token_type == tokenize.NL:
                 self.queriable, newline = True, True
-                buffer += "\n"
+                buffer.append("\n")
                 prev_token = None
                 continue
 
             # Records relative tabbing, used for python code formatting
             if newline:
-                if token.type == tokenize.COMMENT:
+                if token_type == tokenize.COMMENT:
                     # Because comment indent level is not knowable from indent/dedent
                     # tokens, just use its input whitespace level.
-                    buffer += " " * col_nb(token)
+                    buffer.append(" " * col_nb(token))
                 else:
-                    buffer += TAB * self.effective_indent
+                    buffer.append(TAB * self.effective_indent)
 
-            if (token.type == tokenize.NAME or token.string == "@") and self.queriable:
+            if (token_type == tokenize.NAME or token_string == "@") and self.queriable:
                 self.queriable = False
                 return Status(
-                    token, block_indent, self.cur_indent, buffer, False, pythonable
+                    token,
+                    block_indent,
+                    syntax.cur_indent,
+                    "".join(buffer),
+                    False,
+                    pythonable,
                 )
 
-            if add_token_space(prev_token, token, self.in_fstring):
-                buffer += " "
+            if prev_token is not None and add_token_space(
+                prev_token, token, self.in_fstring
+            ):
+                buffer.append(" ")
             prev_token = token
-            if newline:
-                newline = False
-            if not pythonable and token.type != tokenize.COMMENT:
+            newline = False
+            if token_type != tokenize.COMMENT:
                 pythonable = True
-            buffer += token.string
-            buffer += re_add_curly_bracket_if_needed(token)
+            buffer.append(token_string)
+            buffer.append(re_add_curly_bracket_if_needed(token))
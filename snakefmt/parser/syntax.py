@@ -2,10 +2,12 @@
 Code in charge of parsing and validating Snakemake syntax
 """
 
+import re
 import tokenize
 from abc import ABC, abstractmethod
-from re import match as re_match
-from typing import Optional
+from keyword import iskeyword
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional, Sequence
 
 from snakefmt import fstring_tokeniser_in_use
 from snakefmt.exceptions import (
@@ -19,46 +21,56 @@ from snakefmt.exceptions import (
     SyntaxFormError,
     TooManyParameters,
 )
-from snakefmt.types import (
-    COMMENT_SPACING,
-    Token,
-    TokenIterator,
-    col_nb,
-    line_nb,
-    not_empty,
-)
+from snakefmt.types import COMMENT_SPACING, Token, TokenIterator
 
 # ___Token parsing___#
-BRACKETS_OPEN = {"(", "[", "{"}
-BRACKETS_CLOSE = {")", "]", "}"}
+BRACKETS_OPEN = frozenset({"(", "[", "{"})
+BRACKETS_CLOSE = frozenset({")", "]", "}"})
 
 # ___Token spacing: for when cannot run black___#
+NO_SPACING = frozenset()
+NO_SPACE_AFTER = BRACKETS_OPEN | {"."}
+NO_SPACE_BEFORE = BRACKETS_CLOSE | {"[", ":", "."}
 spacing_triggers = {
-    tokenize.NAME: {tokenize.NAME, tokenize.STRING, tokenize.NUMBER, tokenize.OP},
-    tokenize.STRING: {tokenize.NAME, tokenize.OP},
-    tokenize.NUMBER: {tokenize.NAME, tokenize.OP},
-    tokenize.OP: {tokenize.NAME, tokenize.STRING, tokenize.NUMBER, tokenize.OP},
+    tokenize.NAME: frozenset(
+        {tokenize.NAME, tokenize.STRING, tokenize.NUMBER, tokenize.OP}
+    ),
+    tokenize.STRING: frozenset({tokenize.NAME, tokenize.OP}),
+    tokenize.NUMBER: frozenset({tokenize.NAME, tokenize.OP}),
+    tokenize.OP: frozenset(
+        {tokenize.NAME, tokenize.STRING, tokenize.NUMBER, tokenize.OP}
+    ),
 }
 
 if fstring_tokeniser_in_use:
-    spacing_triggers[tokenize.NAME].add(tokenize.FSTRING_START)
-    spacing_triggers[tokenize.OP].add(tokenize.FSTRING_START)
+    spacing_triggers[tokenize.NAME] |= {tokenize.FSTRING_START}
+    spacing_triggers[tokenize.OP] |= {tokenize.FSTRING_START}
     # A more compact spacing syntax than the above.
     fstring_spacing_triggers = {
-        tokenize.NAME: {
-            tokenize.NAME,
-            tokenize.STRING,
-            tokenize.NUMBER,
-        },
-        tokenize.STRING: {tokenize.NAME, tokenize.OP},
-        tokenize.NUMBER: {tokenize.NAME},
-        tokenize.OP: {
-            tokenize.NAME,
-            tokenize.STRING,
-        },
+        tokenize.NAME: frozenset({tokenize.NAME, tokenize.STRING, tokenize.NUMBER}),
+        tokenize.STRING: frozenset({tokenize.NAME, tokenize.OP}),
+        tokenize.NUMBER: frozenset({tokenize.NAME}),
+        tokenize.OP: frozenset({tokenize.NAME, tokenize.STRING}),
     }
 
 
+# ___'use rule' syntax___#
+use_identifier = r"[a-zA-Z_]\S*"
+use_syntax_regexp = re.compile(
+    (
+        r"use rule (?:(?:{id})|\*)"
+        r"(?: from {id})?(?: exclude {id}(?:\s*,\s*{id})*)?"
+        r"(?: as {id})?( with[ ]?:)?$"
+    ).format(id=use_identifier)
+)
+use_ebnf_syntax = (
+    '"use" "rule" (identifier | "*") '
+    '"from" identifier '
+    '["exclude" identifier {"," identifier}] '
+    '["as" identifier] ["with" ":"]'
+)
+
+
 def re_add_curly_bracket_if_needed(token: Token) -> str:
     result = ""
     if (
@@ -92,12 +104,7 @@ def fstring_processing(
 def operator_skip_spacing(prev_token: Token, token: Token) -> bool:
     if prev_token.type != tokenize.OP and token.type != tokenize.OP:
         return False
-    if (
-        prev_token.string in BRACKETS_OPEN
-        or prev_token.string == "."
-        or token.string in BRACKETS_CLOSE
-        or token.string in {"[", ":", "."}
-    ):
+    if prev_token.string in NO_SPACE_AFTER or token.string in NO_SPACE_BEFORE:
         return True
     elif prev_token.type == tokenize.NAME and token.string == "(":
         return True
@@ -108,57 +115,72 @@ def operator_skip_spacing(prev_token: Token, token: Token) -> bool:
 
 
 def add_token_space(prev_token: Token, token: Token, in_fstring: bool = False) -> bool:
-    result = False
-    if prev_token is not None:
-        if not operator_skip_spacing(prev_token, token):
-            if not in_fstring:
-                if token.type in spacing_triggers.get(prev_token.type, {}):
-                    result = True
-            elif token.type in fstring_spacing_triggers.get(prev_token.type, {}):
-                result = True
-    return result
+    triggers = fstring_spacing_triggers if in_fstring else spacing_triggers
+    if token.type not in triggers.get(prev_token.type, NO_SPACING):
+        return False
+    return not operator_skip_spacing(prev_token, token)
 
 
-def is_colon(token: Token):
+def is_colon(token: Token) -> bool:
     return token.type == tokenize.OP and token.string == ":"
 
 
-def is_newline(token: Token):
+def is_newline(token: Token) -> bool:
     return token.type == tokenize.NEWLINE or token.type == tokenize.NL
 
 
-def brack_open(token: Token):
-    return token.type == tokenize.OP and token.string in BRACKETS_OPEN
-
-
-def brack_close(token: Token):
-    return token.type == tokenize.OP and token.string in BRACKETS_CLOSE
-
-
-def is_equal_sign(token: Token):
-    return token.type == tokenize.OP and token.string == "="
-
-
-def is_comma_sign(token: Token):
-    return token.type == tokenize.OP and token.string == ","
-
-
 class Parameter:
     """
     Holds the value of a parameter-accepting keyword
     """
 
+    __slots__ = (
+        "line_nb",
+        "col_nb",
+        "value_line_nb",
+        "key",
+        "_value_parts",
+        "_pre_comments",
+        "_post_comments",
+        "len",
+        "inline",
+        "fully_processed",
+        "_has_inline_comment",
+    )
+
     def __init__(self, token: Token):
-        self.line_nb = line_nb(token)
-        self.col_nb = col_nb(token)
+        self.line_nb, self.col_nb = token.start
+        # Line of the first value element, reported when the value is invalid
+        self.value_line_nb = self.line_nb
         self.key = ""
-        self.value = ""
-        self.pre_comments, self.post_comments = list(), list()
+        self._value_parts: List[str] = list()
+        # Most parameters carry no comments: lists are only created when needed
+        self._pre_comments: Optional[List[str]] = None
+        self._post_comments: Optional[List[str]] = None
         self.len = 0
         self.inline: bool = True
         self.fully_processed: bool = False
         self._has_inline_comment: bool = False
 
+    @property
+    def value(self) -> str:
+        # Built up one element at a time, so joined lazily and kept joined
+        if len(self._value_parts) > 1:
+            self._value_parts = ["".join(self._value_parts)]
+        return self._value_parts[0] if self._value_parts else ""
+
+    @value.setter
+    def value(self, value: str) -> None:
+        self._value_parts = [value] if value else list()
+
+    @property
+    def pre_comments(self) -> Sequence[str]:
+        return self._pre_comments or ()
+
+    @property
+    def post_comments(self) -> Sequence[str]:
+        return self._post_comments or ()
+
     def __repr__(self):
         if self.has_a_key():
             return f"{self.key}={self.value}"
@@ -166,42 +188,55 @@ class Parameter:
             return self.value
 
     def is_empty(self) -> bool:
-        return str(self) == ""
+        return not self.key and not self._value_parts
 
     def add_comment(self, comment: str, indent_level: int) -> None:
         if self.is_empty():
-            self.pre_comments.append(comment)
+            if self._pre_comments is None:
+                self._pre_comments = list()
+            self._pre_comments.append(comment)
         else:
             if self.inline:
                 self._has_inline_comment = True
-            self.post_comments.append(comment)
+            if self._post_comments is None:
+                self._post_comments = list()
+            self._post_comments.append(comment)
 
     def has_a_key(self) -> bool:
         return len(self.key) > 0
 
     def has_value(self) -> bool:
-        return len(self.value) > 0
+        return len(self._value_parts) > 0
+
+    def is_lambda(self) -> bool:
+        """True if the value so far is just the 'lambda' keyword"""
+        return len(self._value_parts) == 1 and self._value_parts[0] == "lambda"
+
+    def extend_value(self, string: str) -> None:
+        if string:
+            self._value_parts.append(string)
 
     def add_elem(self, prev_token: Token, token: Token, in_fstring: bool = False):
-        if add_token_space(prev_token, token, in_fstring) and len(self.value) > 0:
-            self.value += " "
+        # Spacing only matters between elements: skip the check for the first one
+        if (
+            self._value_parts
+            and prev_token is not None
+            and add_token_space(prev_token, token, in_fstring)
+        ):
+            self._value_parts.append(" ")
 
         if self.is_empty():
-            self.col_nb = col_nb(token)
+            self.value_line_nb, self.col_nb = token.start
 
-        self.value += token.string
+        self.extend_value(token.string)
 
     def to_key_val_mode(self, token: Token):
         if not self.has_value():
             raise InvalidParameterSyntax(
                 f"L{token.start[0]}:Operator = used with no preceding key"
             )
-        try:
-            exec(f"{self.value} = 0")
-        except SyntaxError:
-            raise InvalidParameterSyntax(
-                f"L{token.start[0]}:Invalid key {self.value}"
-            ) from None
+        if not self.value.isidentifier() or iskeyword(self.value):
+            raise InvalidParameterSyntax(f"L{token.start[0]}:Invalid key {self.value}")
         self.key = self.value
         self.value = ""
 
@@ -211,7 +246,12 @@ class Vocabulary:
     Responsible for recognising snakemake keywords
     """
 
-    spec = dict()
+    spec: Mapping[str, Any] = MappingProxyType({})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Each vocabulary gets its own read-only view, so no two can share state
+        cls.spec = MappingProxyType(dict(cls.spec))
 
     def recognises(self, keyword: str) -> bool:
         return keyword in self.spec
@@ -226,6 +266,15 @@ class Syntax(ABC):
     Classes derived from it raise syntax errors when snakemake syntax is not respected
     """
 
+    __slots__ = (
+        "keyword_name",
+        "keyword_line",
+        "keyword_indent",
+        "cur_indent",
+        "comment",
+        "token",
+    )
+
     def __init__(
         self, keyword_name: str, keyword_indent: int, snakefile: TokenIterator = None
     ):
@@ -239,22 +288,32 @@ class Syntax(ABC):
 
         if snakefile is not None:
             self.validate_keyword_line(snakefile)
-            if self.token.type == tokenize.COMMENT:
-                self.comment = f"{COMMENT_SPACING}{self.token.string}"
-                self.token = next(snakefile)
 
     @abstractmethod
     def validate_keyword_line(self, snakefile: TokenIterator):
         """Checks the keyword-containing line is syntactically valid"""
 
+    def skip_inline_comment(self, snakefile: TokenIterator):
+        """Records a comment ending the keyword-containing line, and moves past it"""
+        if self.token.type == tokenize.COMMENT:
+            self.comment = f"{COMMENT_SPACING}{self.token.string}"
+            self.token = next(snakefile)
+
     @property
     def line_nb(self):
-        return f"L{line_nb(self.token)}: "
+        return f"L{self.token.start[0]}: "
 
 
 class KeywordSyntax(Syntax):
     """Parses snakemake keywords that accept other keywords, eg 'rule'"""
 
+    __slots__ = (
+        "enter_context",
+        "processed_keywords",
+        "accepts_python_code",
+        "from_python",
+    )
+
     def __init__(
         self,
         keyword_name: str,
@@ -272,7 +331,7 @@ class KeywordSyntax(Syntax):
 
         if incident_syntax is not None:
             if self.token.type != tokenize.NEWLINE:
-                NewlineError(line_nb, self.keyword_line)
+                NewlineError(self.line_nb, self.keyword_line)
             if not from_python:
                 incident_syntax.add_processed_keyword(self.token, self.keyword_line)
 
@@ -283,36 +342,27 @@ class KeywordSyntax(Syntax):
             self.validate_userule_syntax(snakefile)
         else:
             self.validate_rulelike_syntax(snakefile)
+        self.skip_inline_comment(snakefile)
 
     def validate_userule_syntax(self, snakefile: TokenIterator):
-        identifier = r"[a-zA-Z_]\S*"
-        use_syntax_regexp = (
-            r"use rule (?:(?:{id})|\*)"
-            r"(?: from {id})?(?: exclude {id}(?:\s*,\s*{id})*)?"
-            r"(?: as {id})?( with[ ]?:)?$"
-        ).format(id=identifier)
-        use_ebnf_syntax = (
-            '"use" "rule" (identifier | "*") '
-            '"from" identifier '
-            '["exclude" identifier {"," identifier}] '
-            '["as" identifier] ["with" ":"]'
-        )
+        keyword_line = [self.keyword_line]
+        prev_string = ""
         while not is_newline(self.token):
-            if self.token.type == tokenize.COMMENT:
-                break
-            # Tokenizing splits up '<identifier>*' into two tokens
-            if self.token.string not in ("*", ","):
-                self.keyword_line += " "
-            self.keyword_line += self.token.string
-            try:
-                self.token = next(snakefile)
-            except StopIteration:
+            if self.token.type in (tokenize.COMMENT, tokenize.ENDMARKER):
                 break
+            string = self.token.string
+            # Tokenizing splits up '<identifier>*' into two tokens: a '*' is only
+            # spaced out right after the 'rule' of 'use rule' or the 'as' keyword
+            if string not in ("*", ",") or (
+                string == "*" and (len(keyword_line) == 3 or prev_string == "as")
+            ):
+                keyword_line.append(" ")
+            keyword_line.append(string)
+            prev_string = string
+            self.token = next(snakefile)
 
-        self.keyword_line = self.keyword_line.replace(
-            "use rule*", "use rule *"
-        ).replace("as*", "as *")
-        match = re_match(use_syntax_regexp, self.keyword_line)
+        self.keyword_line = "".join(keyword_line)
+        match = use_syntax_regexp.match(self.keyword_line)
         if match is None:
             SyntaxFormError(self.line_nb, self.keyword_line, use_ebnf_syntax)
         if match.groups()[0] is None:
@@ -344,6 +394,17 @@ class KeywordSyntax(Syntax):
 class ParameterSyntax(Syntax):
     """Parses snakemake keywords that do not accept other keywords, eg 'input'"""
 
+    __slots__ = (
+        "positional_params",
+        "keyword_params",
+        "eof",
+        "incident_vocab",
+        "_bracket_depth",
+        "in_fstring",
+        "in_lambda",
+        "found_newline",
+    )
+
     def __init__(
         self,
         keyword_name: str,
@@ -355,7 +416,7 @@ class ParameterSyntax(Syntax):
         self.positional_params, self.keyword_params = list(), list()
         self.eof = False
         self.incident_vocab = incident_vocab
-        self._brackets = list()
+        self._bracket_depth = 0
         self.in_fstring = False
         self.in_lambda = False
         self.found_newline = False
@@ -368,6 +429,7 @@ class ParameterSyntax(Syntax):
         if not is_colon(self.token):
             ColonError(self.line_nb, self.token.string, self.keyword_line)
         self.token = next(snakefile)
+        self.skip_inline_comment(snakefile)
 
     @property
     def all_params(self):
@@ -375,22 +437,23 @@ class ParameterSyntax(Syntax):
 
     @property
     def in_brackets(self):
-        return len(self._brackets) > 0
+        return self._bracket_depth > 0
 
     def parse_params(self, snakefile: TokenIterator):
         cur_param = Parameter(self.token)
         prev_token = None
+        next_token = snakefile.__next__
         while True:
             cur_param = self.process_token(cur_param, prev_token)
-            cur_param.value += re_add_curly_bracket_if_needed(self.token)
-            try:
-                prev_token = self.token
-                self.token = next(snakefile)
-            except StopIteration:
+            cur_param.extend_value(re_add_curly_bracket_if_needed(self.token))
+            # The tokenizer always ends on an ENDMARKER: no token follows it
+            if self.token.type == tokenize.ENDMARKER:
                 self.flush_param(cur_param, skip_empty=True)
                 self.eof = True
                 break
-            if self.check_exit(cur_param):
+            prev_token = self.token
+            self.token = next_token()
+            if self.found_newline and self.check_exit(cur_param):
                 break
 
         if self.num_params() == 0:
@@ -400,10 +463,12 @@ class ParameterSyntax(Syntax):
         exit = False
         if not self.found_newline:
             return exit
-        if not_empty(self.token):
+        token = self.token
+        token_string = token.string
+        if token_string and not token_string.isspace():
             # Special condition for comments: they appear before indents/dedents.
-            if self.token.type == tokenize.COMMENT:
-                if not cur_param.is_empty() and col_nb(self.token) < cur_param.col_nb:
+            if token.type == tokenize.COMMENT:
+                if not cur_param.is_empty() and token.start[1] < cur_param.col_nb:
                     exit = True
             else:
                 exit = self.cur_indent < self.keyword_indent
@@ -412,48 +477,56 @@ class ParameterSyntax(Syntax):
         return exit
 
     def process_token(self, cur_param: Parameter, prev_token: Token) -> Parameter:
-        token_type = self.token.type
+        token = self.token
+        token_type, token_string = token.type, token.string
         # f-string treatment (since python 3.12)
-        self.in_fstring = fstring_processing(self.token, prev_token, self.in_fstring)
+        self.in_fstring = fstring_processing(token, prev_token, self.in_fstring)
         if self.in_fstring:
-            cur_param.add_elem(prev_token, self.token, self.in_fstring)
+            cur_param.add_elem(prev_token, token, self.in_fstring)
             return cur_param
 
         # Eager treatment of comments: tag them onto params
         if token_type == tokenize.COMMENT and not self.in_brackets:
-            cur_param.add_comment(self.token.string, self.keyword_indent)
+            cur_param.add_comment(token_string, self.keyword_indent)
             return cur_param
-        if is_newline(self.token):  # Special treatment for inline comments
+        if token_type == tokenize.NEWLINE or token_type == tokenize.NL:
+            # Special treatment for inline comments
             if not cur_param.is_empty():
                 cur_param.inline = False
             if cur_param.has_value():
-                cur_param.add_elem(prev_token, self.token)
+                cur_param.add_elem(prev_token, token)
             self.found_newline = True
             return cur_param
 
         if cur_param.fully_processed:
             self.flush_param(cur_param)
-            cur_param = Parameter(self.token)
+            cur_param = Parameter(token)
 
         if token_type == tokenize.INDENT:
             self.cur_indent += 1
         elif token_type == tokenize.DEDENT:
             self.cur_indent = max(self.cur_indent - 1, 0)
-        elif is_equal_sign(self.token) and not self.in_brackets and not self.in_lambda:
-            cur_param.to_key_val_mode(self.token)
-        elif is_comma_sign(self.token) and not self.in_brackets and not self.in_lambda:
-            cur_param.fully_processed = True
+        elif (
+            token_type == tokenize.OP
+            and (token_string == "=" or token_string == ",")
+            and not self.in_brackets
+            and not self.in_lambda
+        ):
+            if token_string == "=":
+                cur_param.to_key_val_mode(token)
+            else:
+                cur_param.fully_processed = True
         elif token_type != tokenize.ENDMARKER:
-            if brack_open(self.token):
-                self._brackets.append(self.token.string)
-            if brack_close(self.token):
-                self._brackets.pop()
-            if is_colon(self.token) and self.in_lambda:
-                self.in_lambda = False
-            if len(cur_param.value.split()) == 1:
-                if cur_param.value.lstrip() == "lambda":
-                    self.in_lambda = True
-            cur_param.add_elem(prev_token, self.token)
+            if token_type == tokenize.OP:
+                if token_string in BRACKETS_OPEN:
+                    self._bracket_depth += 1
+                elif token_string in BRACKETS_CLOSE:
+                    self._bracket_depth -= 1
+                elif token_string == ":" and self.in_lambda:
+                    self.in_lambda = False
+            if cur_param.is_lambda():
+                self.in_lambda = True
+            cur_param.add_elem(prev_token, token)
         return cur_param
 
     def flush_param(self, parameter: Parameter, skip_empty: bool = False) -> None:
@@ -477,6 +550,8 @@ class ParameterSyntax(Syntax):
 
 # ___Parameter Syntax Validators___#
 class SingleParam(ParameterSyntax):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -497,16 +572,22 @@ class SingleParam(ParameterSyntax):
 
 
 class ParamList(ParameterSyntax):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
 
 class InlineSingleParam(SingleParam):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
 
 class NoKeyParamList(ParamList):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
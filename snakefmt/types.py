@@ -11,16 +11,8 @@ class Token(NamedTuple):
     end: Tuple[int, int] = (-1, -1)
 
 
-def line_nb(token: Token) -> int:
-    return token.start[0]
-
-
 def col_nb(token: Token) -> int:
     return token.start[1]
 
 
-def not_empty(token: Token):
-    return len(token.string) > 0 and not token.string.isspace()
-
-
 TokenIterator = Iterator[Token]
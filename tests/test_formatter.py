@@ -7,6 +7,7 @@ errors arise, as tested in test_parser.py.
 from io import StringIO
 from unittest import mock
 
+import black
 import pytest
 
 from snakefmt.parser.grammar import SingleParam, SnakeGlobal
@@ -101,6 +102,30 @@ class TestSimpleParamFormatting:
 
         assert actual == expected
 
+    def test_repeated_param_formatted_by_black_once(self):
+        snakecode = (
+            f"rule a:\n{TAB * 1}threads: max(4, n)\n\n\n"
+            f"rule b:\n{TAB * 1}threads: max(4, n)\n"
+        )
+        with mock.patch(
+            "snakefmt.formatter.black.format_str", wraps=black.format_str
+        ) as mock_m:
+            formatter = setup_formatter(snakecode)
+            mock_m.assert_called_once()
+
+        assert formatter.get_formatted() == snakecode
+
+    def test_simple_params_skip_black(self):
+        snakecode = (
+            f"rule a:\n{TAB * 1}input:\n{TAB * 2}a=config,\n{TAB * 2}b=2,\n"
+            f"{TAB * 1}threads: 8\n"
+        )
+        with mock.patch("snakefmt.formatter.black.format_str") as mock_m:
+            formatter = setup_formatter(snakecode)
+            mock_m.assert_not_called()
+
+        assert formatter.get_formatted() == snakecode
+
 
 class TestModuleFormatting:
     def test_module_specific_keyword_formatting(self):
@@ -182,6 +207,21 @@ use rule * from other_workflow exclude ruleC, foo as other_*
         formatter = setup_formatter(snakecode)
         assert formatter.get_formatted() == snakecode
 
+    def test_use_rule_alias_ending_in_as(self):
+        snakecode = "use rule * from module as alias*\n"
+        formatter = setup_formatter(snakecode)
+        assert formatter.get_formatted() == snakecode
+
+    def test_use_rule_alias_starting_with_rule(self):
+        snakecode = "use rule a from m as rule*\n"
+        formatter = setup_formatter(snakecode)
+        assert formatter.get_formatted() == snakecode
+
+    def test_use_rule_excluding_rule_named_rule(self):
+        snakecode = "use rule * from m exclude rule, b as m_*\n"
+        formatter = setup_formatter(snakecode)
+        assert formatter.get_formatted() == snakecode
+
     def test_use_rule_with_comment(self):
         snakecode = (
             "# Comment here\n\n\n"
@@ -1030,6 +1070,21 @@ class TestCommentTreatment:
         formatter = setup_formatter(snakecode)
         assert formatter.get_formatted() == expected
 
+    def test_comment_warnings_report_the_keyword_line(self):
+        snakecode = (
+            "rule a:\n"
+            f"{TAB * 1}input:\n\n"
+            f"{TAB * 2}'x'\n"
+            f"{TAB * 2}# below\n"
+            f"{TAB * 1}threads:\n"
+            f"{TAB * 2}# pre\n"
+            f"{TAB * 2}4\n"
+        )
+        with mock.patch("snakefmt.formatter.Warnings") as mock_warnings:
+            setup_formatter(snakecode)
+        mock_warnings.block_comment_below.assert_called_once_with("input", 2)
+        mock_warnings.comment_relocation.assert_called_once_with("threads", 6)
+
     def test_no_inline_comments_stay_untouched(self):
         snakecode = (
             "rule all:\n"
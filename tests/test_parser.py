@@ -146,6 +146,18 @@ class TestParamSyntax:
             snakefile = Snakefile(stream)
             Formatter(snakefile)
 
+    def test_key_value_reserved_keyword_key_fails(self):
+        with pytest.raises(InvalidParameterSyntax, match="Invalid key"):
+            setup_formatter("rule a:" '\n\tinput: \n\t\tif = "file.txt"')
+
+    def test_key_value_attribute_key_fails(self):
+        with pytest.raises(InvalidParameterSyntax, match="Invalid key"):
+            setup_formatter("rule a:" '\n\tinput: \n\t\ta.b = "file.txt"')
+
+    def test_invalid_parameter_reports_its_line(self):
+        with pytest.raises(InvalidParameterSyntax, match="^L3: f"):
+            setup_formatter("rule a:\n" f"{TAB * 1}input:\n" f"{TAB * 2}f(x y)\n")
+
     def test_single_parameter_keyword_disallows_multiple_parameters(self):
         with pytest.raises(TooManyParameters, match="benchmark"):
             stream = StringIO("rule a:" '\n\tbenchmark: "f1.txt", "f2.txt"')
@@ -230,6 +242,11 @@ class TestPythonCode:
         with pytest.raises(InvalidPython):
             setup_formatter(python_code)
 
+    def test_unbalanced_bracket_reports_its_location(self):
+        snakecode = "6,\n]\n\n\ninclude: snakefile\n"
+        with pytest.raises(InvalidPython, match="Cannot parse: 2:0: ]"):
+            setup_formatter(snakecode)
+
     def test_invalid_python_code_preceding_nested_rule_fails(self):
         snakecode = (
             f"if invalid code here:\n" f"{TAB * 1}rule a:\n" f"{TAB * 2}threads: 1"